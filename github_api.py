@@ -0,0 +1,168 @@
+"""
+GitHub API へのアクセスをまとめたモジュール。
+UI (streamlit_app.py) からはこのモジュールの関数だけを呼び出す。
+"""
+import functools
+import os
+import time
+from urllib.parse import quote_plus, urlencode
+
+import diskcache
+import orjson
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+API_BASE = "https://api.github.com"
+# API レスポンスをキャッシュする秒数（メモリ・ディスク共通）
+CACHE_TTL = 300
+# メモリ上に保持する検索結果の上限（古いものから捨てる）。再起動をまたぐ分はディスクキャッシュが持つ
+CACHE_MAX_ENTRIES = 100
+# GitHub 上の language 名が UI の表示名と異なるもの（Flutter は language='Dart'）
+LANG_MAP = {"Flutter": "Dart"}
+# UI が参照するリポジトリのフィールド。検索結果はこれだけに絞ってキャッシュ・session_state に載せる
+REPO_FIELDS = ("name", "full_name", "description", "stargazers_count", "forks_count", "language", "html_url", "updated_at")
+
+
+def get_token():
+    """
+    GITHUB_TOKEN を st.secrets → 環境変数の順で探す。
+    未認証だと 60回/時 で頭打ちになるため、あれば 5000回/時 の認証リクエストにする。
+    """
+    try:
+        token = st.secrets.get("GITHUB_TOKEN")
+    except FileNotFoundError:
+        # secrets.toml が無い環境
+        token = None
+    return token or os.environ.get("GITHUB_TOKEN")
+
+
+@st.cache_resource
+def get_session():
+    """
+    api.github.com への接続をプールして再利用する Session を返す。
+    再実行やセッションをまたいで 1 つの接続プールを共有するため cache_resource で保持する。
+    """
+    session = requests.Session()
+    # Accept-Encoding は requests の既定値（gzip/deflate、入っていれば br/zstd も）に任せる
+    session.headers.update({"User-Agent": "streamlit-app"})
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+    token = get_token()
+    if token:
+        session.headers["Authorization"] = f"Bearer {token}"
+    return session
+
+
+@st.cache_resource
+def get_rate_limit():
+    """
+    直近のレスポンスから読んだ X-RateLimit-* を保持する dict を返す。
+    キャッシュヒット時も最後に見た残量をサイドバーに出せるようプロセス全体で共有する。
+    """
+    return {}
+
+
+def record_rate_limit(resp):
+    remaining = resp.headers.get("X-RateLimit-Remaining")
+    if remaining is None:
+        return
+    get_rate_limit().update({
+        "remaining": int(remaining),
+        "limit": int(resp.headers.get("X-RateLimit-Limit", 0)),
+        "reset": int(resp.headers.get("X-RateLimit-Reset", 0)),
+    })
+
+
+@st.cache_resource
+def get_disk_cache():
+    """
+    URL -> (取得時刻, ETag, レスポンス本文) を保持するディスクキャッシュを返す。
+    再起動やセッションをまたいでも GitHub への再取得を避けられるようにする。
+    """
+    return diskcache.Cache(".cache")
+
+
+def fetched_at(url):
+    """
+    url のレスポンスを GitHub から最後に取得（または 304 で再検証）した時刻を返す。
+    まだ取得していなければ None。
+    """
+    cached = get_disk_cache().get(url)
+    return cached[0] if cached else None
+
+
+def _fetch_json_raw(url):
+    """
+    キャッシュ層を通さずに url の JSON を取得する（fetch_search から呼ばれる）。
+    ディスクキャッシュ・ETag での再検証はここで行う。
+    実際に GitHub へリクエストした回数を session_state の _net_calls に数える。
+    """
+    disk = get_disk_cache()
+    cached = disk.get(url)
+    # TTL 内ならネットワークに出ずディスクの本文を返す
+    if cached and time.time() - cached[0] < CACHE_TTL:
+        return orjson.loads(cached[2])
+    headers = {"If-None-Match": cached[1]} if cached and cached[1] else {}
+    st.session_state["_net_calls"] = st.session_state.get("_net_calls", 0) + 1
+    try:
+        resp = get_session().get(url, headers=headers, timeout=10)
+        record_rate_limit(resp)
+        # 304 はレート制限にカウントされないので、前回の本文をそのまま使う
+        if resp.status_code == 304 and cached:
+            disk.set(url, (time.time(), cached[1], cached[2]))
+            return orjson.loads(cached[2])
+        resp.raise_for_status()
+        # TTL を過ぎても ETag での再検証に使うため、エントリ自体は期限切れにしない
+        disk.set(url, (time.time(), resp.headers.get("ETag"), resp.content))
+        return orjson.loads(resp.content)
+    except requests.HTTPError as e:
+        return {"__error__": f"HTTPError: {e.response.status_code} {e.response.reason}"}
+    except Exception as e:
+        return {"__error__": str(e)}
+
+
+def fetch_search(url):
+    """
+    Search API 専用の取得処理。items を REPO_FIELDS だけの dict に絞って返す。
+    キャッシュは呼び出し元の search_repos で行う。
+    戻り値: list (items) または dict (エラー情報)
+    """
+    data = _fetch_json_raw(url)
+    # data は dict で items を持つはず
+    if isinstance(data, dict) and "items" in data:
+        return [{k: item[k] for k in REPO_FIELDS if k in item} for item in data["items"]]
+    return data
+
+
+@functools.lru_cache(maxsize=128)
+def search_url(keyword: str, language: str):
+    """
+    search_repos が叩く Search API の URL を組み立てる。
+    - stars:>=1000 を固定条件にする
+    - language が "All" の場合は言語条件を付けない
+    - Flutter は GitHub 上では language='Dart' になっているため内部でマップする
+    """
+    q_parts = []
+    # キーワードがあれば追加（複数ワードはそのままスペースでつなげてよい）
+    if keyword:
+        # 空白や & # + などの記号は最後に urlencode でまとめてエンコードする
+        q_parts.append(keyword)
+
+    if language and language != "All":
+        q_parts.append(f"language:{LANG_MAP.get(language, language)}")
+
+    # スター数条件（要件で固定）
+    q_parts.append("stars:>=1000")
+
+    params = urlencode({"q": " ".join(q_parts), "per_page": 100}, quote_via=quote_plus)
+    return f"{API_BASE}/search/repositories?{params}"
+
+
+# 画面側でスピナーを出しているので、キャッシュ側のスピナーは出さない
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def search_repos(keyword: str, language: str):
+    """
+    GitHub Search API を使ってリポジトリ検索を行う（条件は search_url を参照）。
+    戻り値: list (items) または dict (エラー情報)
+    """
+    return fetch_search(search_url(keyword, language))
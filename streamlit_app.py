@@ -1,13 +1,12 @@
 import streamlit as st
-import json
-from urllib import request, error
-from datetime import datetime
+import heapq
+import time
+
+from github_api import fetched_at, get_rate_limit, search_repos, search_url
 
 # ページタイトルを設定
 st.set_page_config(page_title="俺得GitHub検索ツール")
 
-API_BASE = "https://api.github.com"
-
 # サイドバー見出しをアプリタイトルに変更
 st.sidebar.header("俺得GitHub検索ツール")
 # ユーザー名は指定しない（要件）。キーワードで絞る。
@@ -18,49 +17,6 @@ language = st.sidebar.selectbox("言語", options=["All", "Go", "Java", "Flutter
 # 検索はボタンでトリガー（初期ロードでデータを取らない）
 do_search = st.sidebar.button("検索")
 
-@st.cache_data(ttl=300)
-def fetch_json(url):
-    req = request.Request(url, headers={"User-Agent": "streamlit-app"})
-    try:
-        with request.urlopen(req, timeout=10) as resp:
-            return json.load(resp)
-    except error.HTTPError as e:
-        return {"__error__": f"HTTPError: {e.code} {e.reason}"}
-    except Exception as e:
-        return {"__error__": str(e)}
-
-
-def search_repos(keyword: str, language: str):
-    """
-    GitHub Search API を使ってリポジトリ検索を行う。
-    - stars:>=1000 を固定条件にする
-    - language が "All" の場合は言語条件を付けない
-    - Flutter は GitHub 上では language='Dart' になっているため内部でマップする
-    戻り値: list (items) または dict (エラー情報)
-    """
-    q_parts = []
-    # キーワードがあれば追加（複数ワードはそのままスペースでつなげてよい）
-    if keyword:
-        # 検索クエリでは空白は + にエンコードされるが fetch_json の URL に渡す際に置換する
-        q_parts.append(keyword)
-
-    # 言語マッピング
-    lang_map = {"Flutter": "Dart"}
-    if language and language != "All":
-        q_parts.append(f"language:{lang_map.get(language, language)}")
-
-    # スター数条件（要件で固定）
-    q_parts.append("stars:>=1000")
-
-    q = "+".join([p.replace(" ", "+") for p in q_parts])
-    url = f"{API_BASE}/search/repositories?q={q}&per_page=100"
-    data = fetch_json(url)
-    # data は dict で items を持つはず
-    if isinstance(data, dict) and "items" in data:
-        return data["items"]
-    return data
-
-
 # (スター推移取得機能は削除しました)
 
 st.markdown("## 俺得GitHub検索ツール")
@@ -71,8 +27,12 @@ if 'search_results' not in st.session_state:
     st.session_state['search_error'] = None
 
 if do_search:
+    # 新しい検索結果が入るので、前回選出した上位N件は使えなくなる
+    st.session_state.pop('top_repos_key', None)
     with st.spinner("GitHub を検索しています...（スター数>=1000）"):
         results = search_repos(keyword.strip(), language)
+    # 表示中の結果がいつ GitHub から取得されたものか（キャッシュの鮮度）を覚えておく
+    st.session_state['fetched_at'] = fetched_at(search_url(keyword.strip(), language))
     if isinstance(results, dict) and "__error__" in results:
         st.error(f"検索中にエラーが発生しました: {results['__error__']}")
         st.session_state['search_results'] = []
@@ -92,25 +52,61 @@ else:
     if not repos_list:
         st.info("検索結果がありません。条件を変えて再検索してください。")
     else:
-        # Search API already constrained stars>=1000; 並び替えて上位N件を表示
-        repos_sorted = sorted(repos_list, key=lambda r: r.get("stargazers_count", 0), reverse=True)
-        top_repos = repos_sorted[:top_n]
+        # Search API already constrained stars>=1000; 全件ソートせず上位N件だけ取り出す
+        # 検索結果と N が前回と同じ再実行（ウィジェット操作など）では選出をやり直さない
+        if st.session_state.get('top_repos_key') != top_n:
+            st.session_state['top_repos'] = heapq.nlargest(top_n, repos_list, key=lambda r: r.get("stargazers_count", 0))
+            st.session_state['top_repos_key'] = top_n
+        top_repos = st.session_state['top_repos']
 
         # （スター推移グラフ機能は削除済みのためサイドバーのグラフ化選択はありません）
 
         st.subheader(f"⭐ Top {len(top_repos)} リポジトリ（スター順・⭐>=1000）")
-        for r in top_repos:
-            name = r.get("full_name") or r.get("name")
-            desc = r.get("description") or ""
-            stars = r.get("stargazers_count", 0)
-            forks = r.get("forks_count", 0)
-            lang = r.get("language") or "—"
-            url = r.get("html_url")
-            updated = r.get("updated_at", "")[:10]
-            with st.expander(f"{name} — ⭐ {stars} — {lang}", expanded=False):
-                st.write(desc)
-                st.write(f"[リポジトリへ]({url})  ・  フォーク: {forks}  ・  更新: {updated}")
+        fetched = st.session_state.get('fetched_at')
+        if fetched:
+            age_min = int((time.time() - fetched) // 60)
+            st.caption(f"{age_min}分前に取得したデータ" if age_min else "1分以内に取得したデータ")
+        # リポジトリごとの expander ではなく 1 つの表にまとめ、再実行時に送る要素を減らす
+        names = [r.get("full_name") or r.get("name") for r in top_repos]
+        st.dataframe(
+            {
+                "name": names,
+                "stars": [r.get("stargazers_count", 0) for r in top_repos],
+                "forks": [r.get("forks_count", 0) for r in top_repos],
+                "lang": [r.get("language") or "—" for r in top_repos],
+                "updated": [(r.get("updated_at") or "")[:10] for r in top_repos],
+                "url": [r.get("html_url") for r in top_repos],
+            },
+            column_config={
+                "name": "リポジトリ",
+                "stars": "⭐",
+                "forks": "フォーク",
+                "lang": "言語",
+                "updated": "更新",
+                "url": st.column_config.LinkColumn("リポジトリへ"),
+            },
+            hide_index=True,
+        )
+        with st.expander("説明を表示", expanded=False):
+            st.markdown("\n".join(
+                f"- **{name}** — {r.get('description') or ''}" for name, r in zip(names, top_repos)
+            ))
 
         # スター推移表示は機能削除済み
 
+# このセッションで実際に GitHub へリクエストした回数（キャッシュヒットは数えない）
+st.sidebar.caption(f"ネットワーク取得: {st.session_state.get('_net_calls', 0)} 回")
+
+# 直近に観測した API の残り回数（まだリクエストしていなければ表示しない）
+# 値はネットワークに出たときしか更新されないため、リセット時刻を過ぎたら残量は不明として扱う
+rate = get_rate_limit()
+if rate and time.time() >= rate["reset"]:
+    st.sidebar.caption("API 残り: 不明（リセット済み・次の取得で更新）")
+elif rate:
+    # サーバーのローカル時刻はホスティング先によって異なるため UTC で明示する
+    reset_at = time.strftime("%H:%M UTC", time.gmtime(rate["reset"]))
+    st.sidebar.caption(f"API 残り: {rate['remaining']}/{rate['limit']}（{reset_at} にリセット）")
+    if rate["remaining"] == 0:
+        st.sidebar.warning("GitHub API のレート制限に達しました。リセットまでお待ちください。")
+
 st.caption("データは GitHub のパブリックAPI を利用しています（レート制限あり）。")